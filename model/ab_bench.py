@@ -0,0 +1,276 @@
+"""
+ab_bench.py — Browser Vigilant A/B model benchmark
+===================================================
+Loads two ONNX models, scores the same URL corpus with both and reports
+whether the candidate is slower than, or disagrees with, the baseline.
+Run this before replacing model.onnx (and the repo-root copy the
+extension loads).
+
+Reports:
+  - file size and model load time
+  - batch and single-URL inference latency (p50 / p90 / p99)
+  - feature extraction cost per URL (shared by both models)
+  - score agreement: mean / max |Δp|, correlation, share within tolerance
+  - decision flips at the threshold, and accuracy when labels are known
+
+OFFLINE ONLY — nothing here runs in the browser extension.
+
+Usage:
+    python ab_bench.py                                   # ../model.onnx vs model.onnx
+    python ab_bench.py -a old.onnx -b new.onnx
+    python ab_bench.py --urls heldout.csv                # "url" or "url,label" per line
+    python ab_bench.py --synthetic 20000 --json ab.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from features import extract_features_batch
+
+N_FEATURES = 56
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+def load_corpus(path: str) -> tuple:
+    """
+    One URL per line, optionally followed by ",0" / ",1" (1 = phishing).
+    Labels are returned only if every line has one.
+    """
+    urls, labels = [], []
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.lower() in ("url", "url,label"):
+                continue
+            url, sep, label = line.rpartition(",")
+            if sep and label.strip() in ("0", "1"):
+                urls.append(url.strip())
+                labels.append(int(label))
+            else:
+                urls.append(line)
+                labels.append(None)
+    if any(l is None for l in labels):
+        labels = None
+    return urls, labels
+
+
+_SUBS  = ["", "www.", "login.", "secure.", "m.", "account.verify.", "cdn-"]
+_TLDS  = ["com", "in", "org", "xyz", "top", "co.in", "io", "tk"]
+_PATHS = ["", "/", "/signin", "/account/update", "/claim", "/docs/index.html",
+          "/wp-admin/", "/download/setup.exe", "/../admin", "/search"]
+_QUERY = ["", "?q=shoes", "?next=http://evil.xyz", "?pa=refund@oksbi&am=500",
+          "?vpa=ravi@ybl", "?id=9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+          "?utm_source=mail&utm_medium=cpc&ref=%2F%61%62"]
+
+
+def synthetic_corpus(n: int, seed: int = 42) -> tuple:
+    """Mutations of the train.py fallback corpus, labelled by their source list."""
+    from train import FALLBACK_LEGIT, FALLBACK_PHISHING
+    rng = random.Random(seed)
+    seeds = [(u, 0) for u in sorted(set(FALLBACK_LEGIT))] + \
+            [(u, 1) for u in sorted(set(FALLBACK_PHISHING))]
+    urls, labels = [], []
+    for _ in range(n):
+        url, label = rng.choice(seeds)
+        scheme, _, rest = url.partition("://")
+        host, slash, tail = rest.partition("/")
+        if rng.random() < 0.3:
+            labels_ = host.split(".")
+            host = ".".join(labels_[:-1] + [rng.choice(_TLDS)])
+        if rng.random() < 0.3:
+            host = rng.choice(_SUBS) + host
+        path = "/" + tail if slash else rng.choice(_PATHS)
+        urls.append(f"{scheme}://{host}{path}{rng.choice(_QUERY)}")
+        labels.append(label)
+    return urls, labels
+
+
+# ── Model ─────────────────────────────────────────────────────────────────────
+
+class OnnxModel:
+    """InferenceSession wrapper returning P(phishing) for a feature matrix."""
+
+    def __init__(self, path: str, load_repeats: int = 3):
+        import onnxruntime as rt
+        self.path = path
+        self.size_kb = os.path.getsize(path) / 1024
+        times = []
+        for _ in range(max(load_repeats, 1)):
+            t0 = time.perf_counter()
+            sess = rt.InferenceSession(path, providers=["CPUExecutionProvider"])
+            times.append(time.perf_counter() - t0)
+        self.sess = sess
+        self.load_ms = float(np.median(times) * 1000)
+        self.input_name = sess.get_inputs()[0].name
+        outs = [o.name for o in sess.get_outputs()]
+        self.prob_output = "probabilities" if "probabilities" in outs else outs[-1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        probs = self.sess.run([self.prob_output], {self.input_name: X})[0]
+        return np.asarray(probs)[:, 1]
+
+
+def _percentiles(samples_s: list) -> dict:
+    a = np.asarray(samples_s) * 1000
+    return dict(p50=float(np.percentile(a, 50)), p90=float(np.percentile(a, 90)),
+                p99=float(np.percentile(a, 99)), mean=float(a.mean()))
+
+
+def time_batches(model: OnnxModel, X: np.ndarray, batch_size: int) -> tuple:
+    """Score X in batches; returns (scores, per-batch latency percentiles in ms)."""
+    model.predict(X[:batch_size])          # warm-up
+    scores, lat = [], []
+    for i in range(0, len(X), batch_size):
+        xb = X[i:i + batch_size]
+        t0 = time.perf_counter()
+        scores.append(model.predict(xb))
+        lat.append(time.perf_counter() - t0)
+    return np.concatenate(scores), _percentiles(lat)
+
+
+def time_single(model: OnnxModel, X: np.ndarray, n: int) -> dict:
+    """Latency of one-row calls (what the extension does per navigation), in ms."""
+    model.predict(X[:1])
+    lat = []
+    for i in range(min(n, len(X))):
+        xi = X[i:i + 1]
+        t0 = time.perf_counter()
+        model.predict(xi)
+        lat.append(time.perf_counter() - t0)
+    return _percentiles(lat)
+
+
+# ── Agreement ─────────────────────────────────────────────────────────────────
+
+def agreement(pa: np.ndarray, pb: np.ndarray, threshold: float, tol: float, y=None) -> dict:
+    diff = np.abs(pa - pb)
+    da, db = pa >= threshold, pb >= threshold
+    corr = float(np.corrcoef(pa, pb)[0, 1]) if pa.std() > 0 and pb.std() > 0 else float("nan")
+    out = dict(
+        n=int(len(pa)),
+        mean_abs_diff=float(diff.mean()),
+        max_abs_diff=float(diff.max()),
+        within_tol=float((diff <= tol).mean()),
+        pearson=corr,
+        flips_total=int((da != db).sum()),
+        flips_safe_to_phish=int((~da & db).sum()),
+        flips_phish_to_safe=int((da & ~db).sum()),
+        flip_rate=float((da != db).mean()),
+    )
+    if y is not None:
+        y = np.asarray(y)
+        out["accuracy_a"] = float((da == (y == 1)).mean())
+        out["accuracy_b"] = float((db == (y == 1)).mean())
+    return out
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="A/B throughput and agreement benchmark for two ONNX models.")
+    ap.add_argument("-a", "--model-a", default=os.path.join(HERE, "..", "model.onnx"),
+                    help="baseline model (default: repo-root model.onnx loaded by the extension)")
+    ap.add_argument("-b", "--model-b", default=os.path.join(HERE, "model.onnx"),
+                    help="candidate model (default: model/model.onnx from train.py)")
+    ap.add_argument("--urls", help="held-out corpus: one 'url' or 'url,label' per line")
+    ap.add_argument("--synthetic", type=int, default=10000, help="synthetic corpus size when --urls is not given")
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--single", type=int, default=2000, help="number of one-row calls to time")
+    ap.add_argument("--threshold", type=float, default=0.5, help="decision threshold for flip counts")
+    ap.add_argument("--tol", type=float, default=0.05, help="|Δp| counted as agreement")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args()
+
+    if args.urls:
+        urls, labels = load_corpus(args.urls)
+        source = os.path.basename(args.urls)
+    else:
+        urls, labels = synthetic_corpus(args.synthetic, args.seed)
+        source = f"synthetic({args.synthetic})"
+
+    print("=" * 60)
+    print("  Browser Vigilant — A/B Model Benchmark")
+    print("=" * 60)
+
+    # ── Feature extraction (once, shared by both models) ──────────────────────
+    t0 = time.perf_counter()
+    rows = extract_features_batch(urls)
+    t_extract = time.perf_counter() - t0
+    keep = [i for i, r in enumerate(rows) if r is not None and len(r) == N_FEATURES]
+    if len(keep) < len(rows):
+        print(f"   [WARN] Skipped {len(rows) - len(keep)} URLs during feature extraction")
+    X = np.array([rows[i] for i in keep], dtype=np.float32)
+    y = [labels[i] for i in keep] if labels else None
+    if len(X) == 0:
+        print("[ERROR] Empty corpus.")
+        return 1
+    print(f"\n   Corpus: {source}, {len(X)} URLs"
+          f"{f' ({sum(y)} phishing)' if y else ' (unlabelled)'}")
+    print(f"   Extraction: {t_extract / len(urls) * 1e6:.1f} µs/URL")
+
+    # ── Models ────────────────────────────────────────────────────────────────
+    results = dict(corpus=dict(source=source, n=int(len(X)), labelled=y is not None,
+                               extract_us_per_url=t_extract / len(urls) * 1e6),
+                   threshold=args.threshold)
+    scores = {}
+    OnnxModel(args.model_a, load_repeats=1)   # pay one-off runtime init before timing either model
+    for tag, path in (("a", args.model_a), ("b", args.model_b)):
+        m = OnnxModel(path)
+        s, batch = time_batches(m, X, args.batch_size)
+        single = time_single(m, X, args.single)
+        scores[tag] = s
+        results[tag] = dict(path=os.path.abspath(path), size_kb=m.size_kb, load_ms=m.load_ms,
+                            batch_ms=batch, batch_size=args.batch_size,
+                            urls_per_s=len(X) / (batch["mean"] / 1000 * -(-len(X) // args.batch_size)),
+                            single_ms=single)
+
+    results["agreement"] = agreement(scores["a"], scores["b"], args.threshold, args.tol, y)
+
+    # ── Report ────────────────────────────────────────────────────────────────
+    ra, rb = results["a"], results["b"]
+    print(f"\n  A: {ra['path']}\n  B: {rb['path']}")
+    print(f"\n  {'Metric':<26} {'A':>10} {'B':>10} {'B/A':>7}")
+    print(f"  {'-'*56}")
+    rows_out = [
+        ("file size (KB)", ra["size_kb"], rb["size_kb"]),
+        ("load time (ms)", ra["load_ms"], rb["load_ms"]),
+        (f"batch[{args.batch_size}] p50 (ms)", ra["batch_ms"]["p50"], rb["batch_ms"]["p50"]),
+        (f"batch[{args.batch_size}] p99 (ms)", ra["batch_ms"]["p99"], rb["batch_ms"]["p99"]),
+        ("throughput (URL/s)", ra["urls_per_s"], rb["urls_per_s"]),
+        ("single p50 (ms)", ra["single_ms"]["p50"], rb["single_ms"]["p50"]),
+        ("single p90 (ms)", ra["single_ms"]["p90"], rb["single_ms"]["p90"]),
+        ("single p99 (ms)", ra["single_ms"]["p99"], rb["single_ms"]["p99"]),
+    ]
+    for name, va, vb in rows_out:
+        print(f"  {name:<26} {va:>10.3f} {vb:>10.3f} {vb / va if va else float('nan'):>6.2f}x")
+
+    ag = results["agreement"]
+    print(f"\n  Score agreement (threshold {args.threshold:.2f})")
+    print(f"  {'-'*56}")
+    print(f"  mean |Δp|                  {ag['mean_abs_diff']:.4f}")
+    print(f"  max  |Δp|                  {ag['max_abs_diff']:.4f}")
+    print(f"  within ±{args.tol:<.2f}               {ag['within_tol'] * 100:.2f}%")
+    print(f"  Pearson r                  {ag['pearson']:.4f}")
+    print(f"  flips                      {ag['flips_total']} ({ag['flip_rate'] * 100:.2f}%)"
+          f" — safe→phish {ag['flips_safe_to_phish']}, phish→safe {ag['flips_phish_to_safe']}")
+    if "accuracy_a" in ag:
+        print(f"  accuracy                   A {ag['accuracy_a']:.4f}   B {ag['accuracy_b']:.4f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\n  ✓ Results saved → {os.path.abspath(args.json)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
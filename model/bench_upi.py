@@ -0,0 +1,132 @@
+"""
+bench_upi.py — Group G (F48–F50) benchmark on UPI-heavy URL corpora
+====================================================================
+Compares the compiled analyzer in upi.py against the original inline
+Group G code from features.py, checks that both produce identical
+feature values, and reports per-URL cost for single and batch calls.
+
+Usage:
+    python bench_upi.py                    # synthetic corpus, 20k URLs
+    python bench_upi.py -n 100000          # bigger synthetic corpus
+    python bench_upi.py --file urls.txt    # one URL per line
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+
+from upi import LEGIT_UPI_HANDLES, upi_features, upi_features_batch, analyze_upi_batch
+
+
+# ── Reference: original Group G code (features.py before upi.py) ──────────────
+
+def legacy_group_g(url: str) -> tuple:
+    low = url.lower()
+    upi_re = re.compile(r"[a-zA-Z0-9._-]+@[a-zA-Z]+")
+    f48 = 1.0 if upi_re.search(url) else 0.0
+    suspicious_upi = 0.0
+    fraud_pfx = {"refund","tax","prize","block","kyc","urgent","helpdesk","support","care"}
+    for m in upi_re.finditer(url):
+        handle = m.group().split("@")[-1].lower()
+        prefix = m.group().split("@")[0].lower()
+        if handle not in LEGIT_UPI_HANDLES or any(fp in prefix for fp in fraud_pfx):
+            suspicious_upi = 1.0
+            break
+    f50 = 1.0 if re.search(r"upi://pay|pa=.*@|vpa=", low) else 0.0
+    return f48, suspicious_upi, f50
+
+
+# ── Synthetic corpus ──────────────────────────────────────────────────────────
+
+_HANDLES = sorted(LEGIT_UPI_HANDLES) + ["paytmgov", "googlepay", "government", "sbiupi", "Ybl", "OKSBI"]
+_NAMES = ["ravi", "priya.k", "shop_24", "merchant-01", "refund", "taxrefund",
+          "kycdesk", "helpdesk", "customercare", "prize2024", "urgent.block", "anita99"]
+_HOSTS = ["pay.example.in", "upi-prize.xyz", "paytm-kyc.xyz", "gpay-cashback.top",
+          "sbi-refund.xyz", "www.flipkart.com", "checkout.razorpay.com", "192.168.0.7"]
+
+
+def _rand_token(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(n))
+
+
+def synthetic_corpus(n: int, seed: int = 42) -> list:
+    """UPI-heavy URLs: collect links, long tracking queries, stray e-mails."""
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(n):
+        vpa = f"{rng.choice(_NAMES)}@{rng.choice(_HANDLES)}"
+        params = [f"{_rand_token(rng, rng.randint(2, 8))}={_rand_token(rng, rng.randint(4, 40))}"
+                  for _ in range(rng.randint(2, 25))]
+        kind = rng.random()
+        if kind < 0.25:
+            params[rng.randrange(len(params))] = f"pa={vpa}&pn={rng.choice(_NAMES)}&am={rng.randint(1, 99999)}"
+            url = "upi://pay?" + "&".join(params)
+        elif kind < 0.55:
+            key = rng.choice(["pa", "vpa", "PA", "payee"])
+            params.insert(rng.randrange(len(params) + 1), f"{key}={vpa}")
+            url = f"http://{rng.choice(_HOSTS)}/claim?" + "&".join(params)
+        elif kind < 0.75:
+            url = f"https://{rng.choice(_HOSTS)}/contact/{vpa}.com?" + "&".join(params)
+        elif kind < 0.90:
+            url = f"https://{rng.choice(_HOSTS)}/{_rand_token(rng, 30)}?" + "&".join(params)
+        else:
+            url = f"http://user:pw@{rng.choice(_HOSTS)}/x?next=a@b@c&" + "&".join(params) + "\n" + f"pa={vpa}"
+        urls.append(url)
+    return urls
+
+
+# ── Timing ────────────────────────────────────────────────────────────────────
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("-n", type=int, default=20000, help="synthetic corpus size")
+    ap.add_argument("--file", help="read URLs from this file (one per line) instead")
+    ap.add_argument("--repeat", type=int, default=5, help="timing repeats (best-of)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8", errors="replace") as fh:
+            urls = [line.strip() for line in fh if line.strip()]
+    else:
+        urls = synthetic_corpus(args.n, args.seed)
+    if not urls:
+        print("[ERROR] Empty corpus.")
+        return 1
+
+    mismatches = [u for u in urls if legacy_group_g(u) != upi_features(u)]
+    avg_len = sum(map(len, urls)) / len(urls)
+    print(f"  Corpus: {len(urls)} URLs, avg length {avg_len:.0f} chars")
+    print(f"  Parity: {len(urls) - len(mismatches)}/{len(urls)} identical")
+    for u in mismatches[:5]:
+        print(f"    ✗ {u[:100]!r}: legacy={legacy_group_g(u)} new={upi_features(u)}")
+
+    t_legacy = _time(lambda: [legacy_group_g(u) for u in urls], args.repeat)
+    t_single = _time(lambda: [upi_features(u) for u in urls], args.repeat)
+    t_batch  = _time(lambda: upi_features_batch(urls), args.repeat)
+    t_full   = _time(lambda: analyze_upi_batch(urls), args.repeat)
+
+    per = lambda t: t / len(urls) * 1e6
+    print(f"\n  {'Path':<28} {'µs/URL':>9}  {'Speedup':>8}")
+    print(f"  {'-'*48}")
+    print(f"  {'legacy inline Group G':<28} {per(t_legacy):>9.2f}  {1.0:>7.2f}x")
+    print(f"  {'upi_features (single)':<28} {per(t_single):>9.2f}  {t_legacy / t_single:>7.2f}x")
+    print(f"  {'upi_features_batch':<28} {per(t_batch):>9.2f}  {t_legacy / t_batch:>7.2f}x")
+    print(f"  {'analyze_upi_batch (report)':<28} {per(t_full):>9.2f}  {t_legacy / t_full:>7.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
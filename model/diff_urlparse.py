@@ -0,0 +1,125 @@
+"""
+diff_urlparse.py — differential check: span parser vs urlparse
+==============================================================
+Fuzzes a large URL corpus and checks that parse_url_parts (single-scan
+spans from urlspan.py) returns exactly what the original urlparse-based
+parser returns, for every field. Also reports how often the fast path
+is taken and the per-URL cost of both parsers.
+
+Exits non-zero on any mismatch.
+
+Usage:
+    python diff_urlparse.py                 # 200k fuzzed URLs
+    python diff_urlparse.py -n 1000000 --seed 7
+    python diff_urlparse.py --file urls.txt # also check a real corpus
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from features import parse_url_parts, _parse_url_parts_urllib
+from urlspan import parse_url_spans
+
+# Characters that change how a URL splits, plus filler
+_DELIMS = ":/?#@[];.%=&+-_ "
+_FILLER = "abcxyzABC019"
+_ODD    = ["\t", "\n", "\r", "\x00", "\x1f", "é", "ß", "１", "²", "℀", "＃"]
+
+_SCHEMES = ["http", "https", "HTTP", "ftp", "upi", "data", "javascript", "tel",
+            "mailto", "file", "h2", "a+b", "x.y-z", "9http", ""]
+_HOSTS   = ["example.com", "www.google.com", "a.b.c.d.e.xyz", "192.168.0.1", "localhost",
+            "xn--pple-43d.com", "EXAMPLE.COM", "", "host-name.co.in", "[::1]", "[fe80::1%25en0]"]
+_PORTS   = ["", ":80", ":8080", ":", ":abc", ":99999", ":0443", ":²"]
+_USERS   = ["", "user@", "user:pw@", "a@b@", "@", "x:y:z@"]
+_PATHS   = ["", "/", "/a/b", "/a;p=1/b;q", "/x.php;jsessionid=1", ";p", "//double", "/../..",
+            "/file.pdf.exe", "/%2e%2e/", "/a:b"]
+_QUERIES = ["", "?", "?a=1&b=2", "?pa=x@ybl", "?a?b", "?a#b", "?next=http://evil.xyz/?q=1"]
+_FRAGS   = ["", "#", "#top", "#a?b", "#a#b"]
+
+
+def _structured(rng: random.Random) -> str:
+    scheme = rng.choice(_SCHEMES)
+    sep = rng.choice(["://", ":", ":/", "//", ":///", ""]) if scheme else rng.choice(["//", ""])
+    return (scheme + sep + rng.choice(_USERS) + rng.choice(_HOSTS) + rng.choice(_PORTS)
+            + rng.choice(_PATHS) + rng.choice(_QUERIES) + rng.choice(_FRAGS))
+
+
+def _noise(rng: random.Random) -> str:
+    alphabet = _DELIMS + _FILLER
+    s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+    if rng.random() < 0.5:
+        s = rng.choice(_SCHEMES) + rng.choice(["://", ":"]) + s
+    return s
+
+
+def _mutate(rng: random.Random, s: str) -> str:
+    for _ in range(rng.randint(1, 3)):
+        i = rng.randint(0, len(s))
+        op = rng.random()
+        if op < 0.4:
+            s = s[:i] + rng.choice(_DELIMS) + s[i:]
+        elif op < 0.55:
+            s = s[:i] + rng.choice(_ODD) + s[i:]
+        elif op < 0.75:
+            s = s[:i] + s[i + 1:]
+        else:
+            s = s[:i] + s[i:].upper()
+    return s
+
+
+def fuzz_corpus(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.5:
+            u = _structured(rng)
+        elif r < 0.75:
+            u = _mutate(rng, _structured(rng))
+        else:
+            u = _noise(rng)
+        out.append(u)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Differential check of parse_url_parts against urlparse.")
+    ap.add_argument("-n", type=int, default=200000, help="fuzzed corpus size")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--file", help="also check URLs from this file (one per line)")
+    args = ap.parse_args()
+
+    urls = fuzz_corpus(args.n, args.seed)
+    if args.file:
+        with open(args.file, encoding="utf-8", errors="replace") as fh:
+            urls += [line.rstrip("\n") for line in fh]
+
+    mismatches = []
+    for u in urls:
+        new, old = parse_url_parts(u), _parse_url_parts_urllib(u)
+        if new != old:
+            mismatches.append((u, new, old))
+    fast = sum(1 for u in urls if parse_url_spans(u) is not None)
+
+    print(f"  Corpus: {len(urls)} URLs ({fast / len(urls) * 100:.1f}% on the span fast path)")
+    print(f"  Parity: {len(urls) - len(mismatches)}/{len(urls)} identical")
+    for u, new, old in mismatches[:10]:
+        diff = {k: (new[k], old[k]) for k in old if new.get(k) != old[k]}
+        print(f"    ✗ {u!r}: {diff}")
+
+    # Timing on the fuzzed corpus; urlsplit memoises, so use distinct strings each pass
+    for name, fn in (("urlparse", _parse_url_parts_urllib), ("spans", parse_url_parts)):
+        batch = [u + "/" + str(i) for i, u in enumerate(urls[:100000])]
+        t0 = time.perf_counter()
+        for u in batch:
+            fn(u)
+        dt = time.perf_counter() - t0
+        print(f"  {name:<9} {dt / len(batch) * 1e6:6.2f} µs/URL")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,9 @@ import math
 import re
 from urllib.parse import urlparse
 
+from upi import LEGIT_UPI_HANDLES, upi_features
+from urlspan import match_url, params_start
+
 # ── Constants (used only for feature COMPUTATION, not runtime lookup) ──────────
 # These determine feature values — they are part of the algorithm,
 # the same as a word2vec vocabulary is part of an NLP model.
@@ -36,15 +39,6 @@ SUSPICIOUS_TLDS = {
     "tech","store","shop","ru","cn","vip","win","loan","download",
 }
 
-LEGIT_UPI_HANDLES = {
-    "okaxis","okicici","oksbi","okhdfcbank","ybl","ibl","axl","apl","fbl",
-    "upi","paytm","waaxis","waxis","rajgovhdfcbank","barodampay","allbank",
-    "andb","aubank","cnrb","csbpay","dbs","dcb","federal","hdfcbank","idbi",
-    "idfc","indus","idfcbank","jio","kotak","lvb","mahb","nsdl","pnb",
-    "psb","rbl","sib","tjsb","uco","union","united","vijb","yapl","airtel",
-    "airtelpaymentsbank","postbank",
-}
-
 SHORT_URL_SERVICES = {
     "bit.ly","tinyurl.com","t.co","goo.gl","ow.ly","is.gd","buff.ly",
     "adf.ly","tiny.cc","clck.ru","cutt.ly","rb.gy","short.io","v.gd",
@@ -116,6 +110,25 @@ def char_ngram_entropy(s: str, n: int = 2) -> float:
 
 
 def parse_url_parts(url: str) -> dict:
+    m = match_url(url)
+    if m is None:
+        return _parse_url_parts_urllib(url)
+    scheme, _, _, host, port_str, path, query, fragment = m.groups("")
+    path   = path[:params_start(path, scheme)]
+    host   = host.lower()
+    port   = int(port_str) if port_str.isdigit() else None
+    labels = host.split(".")
+    tld    = labels[-1]
+    reg    = ".".join(labels[-2:]) if len(labels) >= 2 else host
+    sub    = ".".join(labels[:-2]) if len(labels) > 2 else ""
+    return dict(scheme=scheme.lower(), host=host, path=path,
+                query=query, fragment=fragment, port=port,
+                tld=tld, registered_domain=reg, subdomain=sub,
+                labels=labels)
+
+
+def _parse_url_parts_urllib(url: str) -> dict:
+    """urlparse-based parser — fallback for URLs parse_url_spans declines."""
     try:
         p = urlparse(url)
         netloc    = p.netloc.lower()
@@ -232,18 +245,7 @@ def extract_features(url: str) -> list:
     f[47] = float(path.count("/"))                   # path depth
 
     # ── GROUP G: UPI / Payment Specific (F48–F52) ──────────────────────────────
-    upi_re = re.compile(r"[a-zA-Z0-9._-]+@[a-zA-Z]+")
-    f[48] = 1.0 if upi_re.search(url) else 0.0      # UPI VPA pattern present
-    suspicious_upi = 0.0
-    fraud_pfx = {"refund","tax","prize","block","kyc","urgent","helpdesk","support","care"}
-    for m in upi_re.finditer(url):
-        handle = m.group().split("@")[-1].lower()
-        prefix = m.group().split("@")[0].lower()
-        if handle not in LEGIT_UPI_HANDLES or any(fp in prefix for fp in fraud_pfx):
-            suspicious_upi = 1.0
-            break
-    f[49] = suspicious_upi                           # suspicious UPI VPA
-    f[50] = 1.0 if re.search(r"upi://pay|pa=.*@|vpa=", low) else 0.0  # UPI collect request
+    f[48], f[49], f[50] = upi_features(url, low)    # VPA present / suspicious VPA / collect request
 
     # ── GROUP H: File & Extension Risk (F51–F55) ───────────────────────────────
     ext_m = re.search(r"\.([a-zA-Z0-9]{1,5})(?:[?#]|$)", path)
@@ -259,6 +261,21 @@ def extract_features(url: str) -> list:
     return f
 
 
+def extract_features_batch(urls: list) -> list:
+    """
+    Batch form of extract_features — one 56-float list per URL, same order.
+    URLs that fail to parse get None instead of raising, so one bad row
+    does not abort a whole batch.
+    """
+    out = []
+    for url in urls:
+        try:
+            out.append(extract_features(url))
+        except Exception:
+            out.append(None)
+    return out
+
+
 FEATURE_NAMES = [
     # Group A
     "url_length", "domain_length", "path_length", "query_length",
@@ -0,0 +1,181 @@
+"""
+runreport.py — Browser Vigilant training run report
+====================================================
+Stage-level instrumentation for train.py: wall time, CPU time and peak
+RSS per stage, written as JSON next to model.onnx so runs can be diffed.
+
+OFFLINE ONLY — nothing here runs in the browser extension.
+
+Usage:
+    with REPORT.stage("extract_all", rows=len(urls)):
+        ...
+    REPORT.write("train_report.json")
+
+    python runreport.py old.json new.json     # compare two runs
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource          # POSIX only; on Windows RSS fields are null
+except ImportError:
+    resource = None
+
+REPORT_VERSION = 1
+
+
+# ── Process probes ─────────────────────────────────────────────────────────────
+
+def _maxrss_mb(who) -> float:
+    """High-water RSS in MB for RUSAGE_SELF / RUSAGE_CHILDREN, or None."""
+    if resource is None:
+        return None
+    kb = resource.getrusage(who).ru_maxrss
+    if sys.platform == "darwin":   # macOS reports bytes, Linux kilobytes
+        kb /= 1024
+    return kb / 1024
+
+
+def _children_cpu_s() -> float:
+    """CPU seconds of terminated child processes (joblib/loky workers)."""
+    if resource is None:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+def _current_rss_mb() -> float:
+    """Current RSS in MB (Linux /proc only), or None."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _round(v, nd=3):
+    return None if v is None else round(v, nd)
+
+
+# ── Report ─────────────────────────────────────────────────────────────────────
+
+class RunReport:
+    """
+    Collects one record per stage. Peak RSS is a process-lifetime
+    high-water mark, so each record also stores how much the stage raised
+    it (`peak_rss_growth_mb`); the stage with the largest growth is the
+    one that set the run's peak.
+    """
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.stages = []
+        self.meta = {}
+
+    def note(self, **meta):
+        """Attach run-level metadata (dataset sizes, model params, …)."""
+        self.meta.update(meta)
+
+    @contextmanager
+    def stage(self, name: str, **meta):
+        """Time the enclosed block; `meta` is stored with the stage record."""
+        rec = dict(name=name, meta=dict(meta))
+        peak0 = _maxrss_mb(resource.RUSAGE_SELF) if resource else None
+        child_cpu0 = _children_cpu_s()
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        try:
+            yield rec["meta"]
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = time.process_time() - cpu0
+            peak1 = _maxrss_mb(resource.RUSAGE_SELF) if resource else None
+            rec.update(
+                wall_s=_round(wall),
+                cpu_s=_round(cpu),
+                children_cpu_s=_round(_children_cpu_s() - child_cpu0),
+                peak_rss_mb=_round(peak1, 1),
+                peak_rss_growth_mb=_round(None if peak1 is None else peak1 - peak0, 1),
+                rss_mb=_round(_current_rss_mb(), 1),
+                children_peak_rss_mb=_round(
+                    _maxrss_mb(resource.RUSAGE_CHILDREN) if resource else None, 1),
+            )
+            self.stages.append(rec)
+            print(f"   ⏱  {name}: {wall:.2f}s wall, {cpu:.2f}s CPU"
+                  + (f", peak RSS {peak1:.0f} MB" if peak1 is not None else ""))
+
+    def to_dict(self) -> dict:
+        peak_stage = None
+        growth = [s for s in self.stages if s["peak_rss_growth_mb"] is not None]
+        if growth:
+            peak_stage = max(growth, key=lambda s: s["peak_rss_growth_mb"])["name"]
+        slowest = max(self.stages, key=lambda s: s["wall_s"])["name"] if self.stages else None
+        return dict(
+            version=REPORT_VERSION,
+            started=self.started.isoformat(timespec="seconds"),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            cpu_count=os.cpu_count(),
+            argv=sys.argv,
+            total=dict(
+                wall_s=_round(time.perf_counter() - self._t0),
+                cpu_s=_round(time.process_time() - self._cpu0),
+                children_cpu_s=_round(_children_cpu_s()),
+                peak_rss_mb=_round(_maxrss_mb(resource.RUSAGE_SELF) if resource else None, 1),
+            ),
+            slowest_stage=slowest,
+            peak_rss_stage=peak_stage,
+            stages=self.stages,
+            meta=self.meta,
+        )
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2, default=str)
+        print(f"  ✓ Run report saved → {os.path.abspath(path)}")
+
+
+REPORT = RunReport()
+
+
+def report_path_for(model_path: str) -> str:
+    """train_report.json in the same directory as the exported model."""
+    return os.path.join(os.path.dirname(os.path.abspath(model_path)), "train_report.json")
+
+
+# ── Compare ────────────────────────────────────────────────────────────────────
+
+def compare(old: dict, new: dict) -> str:
+    """Side-by-side stage table of two reports (matched by stage name)."""
+    def by_name(r):
+        return {s["name"]: s for s in r["stages"]}
+    a, b = by_name(old), by_name(new)
+    names = list(a) + [n for n in b if n not in a]
+    fmt = lambda v, nd=2: "—" if v is None else f"{v:.{nd}f}"
+    lines = [f"  {'Stage':<24} {'Wall old':>9} {'Wall new':>9} {'Δ%':>7}  {'Peak old':>9} {'Peak new':>9}",
+             f"  {'-'*74}"]
+    for n in names + ["(total)"]:
+        so = old["total"] if n == "(total)" else a.get(n, {})
+        sn = new["total"] if n == "(total)" else b.get(n, {})
+        wo, wn = so.get("wall_s"), sn.get("wall_s")
+        delta = (wn - wo) / wo * 100 if wo and wn is not None else None
+        lines.append(f"  {n:<24} {fmt(wo):>9} {fmt(wn):>9} {fmt(delta, 1):>7}  "
+                     f"{fmt(so.get('peak_rss_mb'), 0):>9} {fmt(sn.get('peak_rss_mb'), 0):>9}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python runreport.py OLD_REPORT.json NEW_REPORT.json")
+        sys.exit(2)
+    with open(sys.argv[1], encoding="utf-8") as f1, open(sys.argv[2], encoding="utf-8") as f2:
+        print(compare(json.load(f1), json.load(f2)))
@@ -0,0 +1,172 @@
+"""
+scheduler.py — Browser Vigilant training resource scheduler
+============================================================
+Splits a core and memory budget between fold-level parallelism (CV folds
+run in separate worker processes) and tree-level parallelism (threads
+inside each RandomForest fit), so nested n_jobs=-1 no longer
+oversubscribes shared training nodes.
+
+The feature matrix is shared read-only between fold workers through a
+memory-mapped .npy file; only each fold's training slice is copied.
+
+OFFLINE ONLY — nothing here runs in the browser extension.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+WORKER_OVERHEAD_BYTES = 200 * 1024 ** 2   # interpreter + numpy/sklearn per process
+NODE_BYTES = 88                           # sklearn tree node (64) + 2-class value (16) + slack
+MiB = 1024 ** 2
+
+
+# ── Budget detection ──────────────────────────────────────────────────────────
+
+def detect_cores() -> int:
+    """CPUs this process may run on (respects taskset / cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:            # macOS / Windows
+        return os.cpu_count() or 1
+
+
+def detect_memory_bytes() -> int:
+    """
+    Memory available to this process: the cgroup limit if one is set,
+    else MemAvailable from /proc/meminfo. None if neither can be read.
+    """
+    limit = None
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as fh:
+                raw = fh.read().strip()
+            if raw.isdigit() and int(raw) < 1 << 60:
+                limit = int(raw)
+                break
+        except OSError:
+            continue
+    avail = None
+    try:
+        with open("/proc/meminfo") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    avail = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        pass
+    known = [v for v in (limit, avail) if v is not None]
+    return min(known) if known else None
+
+
+# ── Memory model ──────────────────────────────────────────────────────────────
+
+def forest_bytes(n_rows: int, n_estimators: int, max_depth: int, min_samples_leaf: int,
+                 nodes_per_tree: int = None) -> int:
+    """
+    Node storage of a fitted forest. Uses `nodes_per_tree` when it is known
+    (e.g. measured on a probe forest), else the depth / leaf-size bound.
+    """
+    if nodes_per_tree is None:
+        by_depth = 2 ** (max_depth + 1) - 1 if max_depth else float("inf")
+        by_rows = 2 * n_rows / max(min_samples_leaf, 1)
+        nodes_per_tree = min(by_depth, by_rows)
+    return int(n_estimators * nodes_per_tree * NODE_BYTES)
+
+
+def fit_bytes(n_train: int, n_features: int, tree_jobs: int, n_estimators: int,
+              max_depth: int, min_samples_leaf: int, nodes_per_tree: int = None) -> int:
+    """
+    Private memory of one forest fit: its copy of the training rows,
+    per-thread bootstrap / index buffers, the fitted forest and the
+    process overhead. The shared memory-mapped X is not counted here.
+    """
+    x_train = n_train * n_features * 4
+    buffers = n_train * 8 * (3 + tree_jobs)
+    forest = forest_bytes(n_train, n_estimators, max_depth, min_samples_leaf, nodes_per_tree)
+    return x_train + buffers + forest + WORKER_OVERHEAD_BYTES
+
+
+# ── Planner ───────────────────────────────────────────────────────────────────
+
+def plan_parallelism(n_folds: int, n_rows: int, n_features: int, n_estimators: int,
+                     max_depth: int, min_samples_leaf: int,
+                     cores: int = None, mem_bytes: int = None,
+                     nodes_per_tree: int = None) -> dict:
+    """
+    Choose fold_jobs × tree_jobs ≤ cores that fits the memory budget and
+    minimises the estimated CV makespan, ceil(folds / fold_jobs) ×
+    ceil(trees / tree_jobs). Ties go to fewer fold workers (less memory).
+    `cores` / `mem_bytes` default to what the machine reports; pass a
+    measured `nodes_per_tree` for a tighter forest-size estimate.
+    """
+    cores = max(int(cores or detect_cores()), 1)
+    budget_src = "given" if mem_bytes else "detected"
+    mem_bytes = mem_bytes or detect_memory_bytes()
+    shared = n_rows * n_features * 4
+    n_train = n_rows * (n_folds - 1) // n_folds
+
+    best = None
+    for fold_jobs in range(1, min(n_folds, cores) + 1):
+        tree_jobs = max(cores // fold_jobs, 1)
+        need = shared + fold_jobs * fit_bytes(n_train, n_features, tree_jobs, n_estimators,
+                                              max_depth, min_samples_leaf, nodes_per_tree)
+        if mem_bytes is not None and need > mem_bytes and fold_jobs > 1:
+            break
+        cost = math.ceil(n_folds / fold_jobs) * math.ceil(n_estimators / min(tree_jobs, n_estimators))
+        if best is None or cost < best["cost"]:
+            best = dict(fold_jobs=fold_jobs, tree_jobs=tree_jobs, est_bytes=need, cost=cost)
+
+    final_need = shared + fit_bytes(n_rows, n_features, cores, n_estimators,
+                                    max_depth, min_samples_leaf, nodes_per_tree)
+    return dict(
+        cores=cores,
+        mem_budget_mb=None if mem_bytes is None else round(mem_bytes / MiB),
+        mem_budget_source=budget_src if mem_bytes is not None else "unknown",
+        fold_jobs=best["fold_jobs"],
+        tree_jobs=best["tree_jobs"],
+        final_tree_jobs=cores,
+        nodes_per_tree=nodes_per_tree,
+        shared_x_mb=round(shared / MiB, 1),
+        est_cv_peak_mb=round(best["est_bytes"] / MiB),
+        est_final_peak_mb=round(final_need / MiB),
+        over_budget=mem_bytes is not None and best["est_bytes"] > mem_bytes,
+    )
+
+
+def describe_plan(plan: dict) -> str:
+    budget = "unknown" if plan["mem_budget_mb"] is None else \
+        f"{plan['mem_budget_mb']} MB ({plan['mem_budget_source']})"
+    lines = [
+        f"   Budget: {plan['cores']} cores, memory {budget}",
+        f"   CV:     {plan['fold_jobs']} fold workers × {plan['tree_jobs']} tree threads "
+        f"(est. peak {plan['est_cv_peak_mb']} MB, shared X {plan['shared_x_mb']} MB memory-mapped)",
+        f"   Final:  {plan['final_tree_jobs']} tree threads (est. peak {plan['est_final_peak_mb']} MB)",
+    ]
+    if plan["over_budget"]:
+        lines.append("   [WARN] Even one fold worker exceeds the memory budget; running folds serially.")
+    return "\n".join(lines)
+
+
+# ── Shared read-only arrays ───────────────────────────────────────────────────
+
+@contextmanager
+def shared_readonly(arr: np.ndarray, tmp_dir: str = None):
+    """
+    Yields a read-only memmap of `arr` backed by a temporary .npy file.
+    joblib passes memmaps to worker processes by filename, so every fold
+    worker maps the same pages instead of unpickling its own copy.
+    """
+    d = tempfile.mkdtemp(prefix="bv-train-", dir=tmp_dir)
+    path = os.path.join(d, "X.npy")
+    try:
+        np.save(path, np.ascontiguousarray(arr))
+        mm = np.load(path, mmap_mode="r")
+        yield mm
+        del mm
+    finally:
+        shutil.rmtree(d, ignore_errors=True)
@@ -12,12 +12,15 @@ Usage:
     python -m venv venv
     venv\\Scripts\\activate      # Windows
     pip install -r requirements.txt
-    python train.py             # → model.onnx
+    python train.py             # → model.onnx + train_report.json
+    python train.py --cores 8 --mem-gb 12   # stay within a shared node's budget
 """
 
+import argparse
 import io
 import os
 import sys
+import time
 import zipfile
 import warnings
 import numpy as np
@@ -28,11 +31,16 @@ import requests
 warnings.filterwarnings("ignore")
 
 from features import extract_features, FEATURE_NAMES
+from runreport import REPORT, report_path_for
+from scheduler import plan_parallelism, describe_plan, detect_cores, shared_readonly
 
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier, GradientBoostingClassifier
 from sklearn.calibration import CalibratedClassifierCV
-from sklearn.model_selection import StratifiedKFold, cross_validate
-from sklearn.metrics import classification_report, roc_auc_score
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from sklearn.metrics import (classification_report, roc_auc_score, accuracy_score,
+                             precision_score, recall_score, f1_score)
+from joblib import Parallel, delayed
 from imblearn.over_sampling import SMOTE
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
@@ -89,37 +97,38 @@ def load_phiusiil(sample: int = 60000) -> tuple:
     Label 1 = phishing, 0 = legitimate.
     Returns (urls, labels) with up to `sample` examples.
     """
-    raw = download_bytes(DATASETS["phiusiil"]["url"], DATASETS["phiusiil"]["description"])
+    with REPORT.stage("download.phiusiil"):
+        raw = download_bytes(DATASETS["phiusiil"]["url"], DATASETS["phiusiil"]["description"])
     if not raw:
         return [], []
-
-    try:
-        zf = zipfile.ZipFile(io.BytesIO(raw))
-        csv_names = [n for n in zf.namelist() if n.endswith(".csv")]
-        if not csv_names:
+    with REPORT.stage("parse.phiusiil"):
+        try:
+            zf = zipfile.ZipFile(io.BytesIO(raw))
+            csv_names = [n for n in zf.namelist() if n.endswith(".csv")]
+            if not csv_names:
+                return [], []
+            df = pd.read_csv(zf.open(csv_names[0]), usecols=["URL", "label"], dtype=str)
+            df.columns = df.columns.str.strip().str.lower()
+
+            # label: 1 = phishing, 0 = legit (PhiUSIIL convention)
+            df = df.dropna()
+            df["label"] = df["label"].astype(str).str.strip()
+            df = df[df["label"].isin(["0", "1", "phishing", "legitimate", "safe"])]
+            df["label"] = df["label"].map(
+                lambda x: 1 if x in ("1", "phishing") else 0
+            )
+
+            # Balance & sample
+            phish = df[df["label"] == 1].sample(min(sample // 2, len(df[df["label"] == 1])), random_state=42)
+            legit = df[df["label"] == 0].sample(min(sample // 2, len(df[df["label"] == 0])), random_state=42)
+            df = pd.concat([phish, legit])
+            urls = df["URL"].str.strip().tolist()
+            labels = df["label"].tolist()
+            print(f"   ✓ PhiUSIIL: {len(labels)} URLs ({sum(labels)} phishing, {len(labels)-sum(labels)} legit)")
+            return urls, labels
+        except Exception as e:
+            print(f"   [WARN] PhiUSIIL parse failed: {e}")
             return [], []
-        df = pd.read_csv(zf.open(csv_names[0]), usecols=["URL", "label"], dtype=str)
-        df.columns = df.columns.str.strip().str.lower()
-
-        # label: 1 = phishing, 0 = legit (PhiUSIIL convention)
-        df = df.dropna()
-        df["label"] = df["label"].astype(str).str.strip()
-        df = df[df["label"].isin(["0", "1", "phishing", "legitimate", "safe"])]
-        df["label"] = df["label"].map(
-            lambda x: 1 if x in ("1", "phishing") else 0
-        )
-
-        # Balance & sample
-        phish = df[df["label"] == 1].sample(min(sample // 2, len(df[df["label"] == 1])), random_state=42)
-        legit = df[df["label"] == 0].sample(min(sample // 2, len(df[df["label"] == 0])), random_state=42)
-        df = pd.concat([phish, legit])
-        urls = df["URL"].str.strip().tolist()
-        labels = df["label"].tolist()
-        print(f"   ✓ PhiUSIIL: {len(labels)} URLs ({sum(labels)} phishing, {len(labels)-sum(labels)} legit)")
-        return urls, labels
-    except Exception as e:
-        print(f"   [WARN] PhiUSIIL parse failed: {e}")
-        return [], []
 
 
 # ── Load PhishTank ────────────────────────────────────────────────────────────
@@ -129,26 +138,28 @@ def load_phishtank(max_phishing: int = 15000) -> tuple:
     PhishTank: verified phishing URLs. All label=1.
     Returns (urls, labels).
     """
-    raw = download_bytes(DATASETS["phishtank"]["url"], DATASETS["phishtank"]["description"])
+    with REPORT.stage("download.phishtank"):
+        raw = download_bytes(DATASETS["phishtank"]["url"], DATASETS["phishtank"]["description"])
     if not raw:
         return [], []
-    try:
-        df = pd.read_csv(
-            io.BytesIO(raw),
-            usecols=["url", "verified"],
-            dtype=str,
-            on_bad_lines="skip",
-        )
-        df = df[df["verified"].str.strip().str.lower() == "yes"]
-        df = df.dropna(subset=["url"])
-        df = df.head(max_phishing)
-        urls = df["url"].str.strip().tolist()
-        labels = [1] * len(urls)
-        print(f"   ✓ PhishTank: {len(urls)} phishing URLs")
-        return urls, labels
-    except Exception as e:
-        print(f"   [WARN] PhishTank parse failed: {e}")
-        return [], []
+    with REPORT.stage("parse.phishtank"):
+        try:
+            df = pd.read_csv(
+                io.BytesIO(raw),
+                usecols=["url", "verified"],
+                dtype=str,
+                on_bad_lines="skip",
+            )
+            df = df[df["verified"].str.strip().str.lower() == "yes"]
+            df = df.dropna(subset=["url"])
+            df = df.head(max_phishing)
+            urls = df["url"].str.strip().tolist()
+            labels = [1] * len(urls)
+            print(f"   ✓ PhishTank: {len(urls)} phishing URLs")
+            return urls, labels
+        except Exception as e:
+            print(f"   [WARN] PhishTank parse failed: {e}")
+            return [], []
 
 
 # ── Load Tranco (legitimate) ──────────────────────────────────────────────────
@@ -158,28 +169,30 @@ def load_tranco(n: int = 15000) -> tuple:
     Tranco top-1M: high-confidence legitimate domains.
     Returns https:// URLs for top n domains. All label=0.
     """
-    raw = download_bytes(DATASETS["tranco"]["url"], DATASETS["tranco"]["description"])
+    with REPORT.stage("download.tranco"):
+        raw = download_bytes(DATASETS["tranco"]["url"], DATASETS["tranco"]["description"])
     if not raw:
         return [], []
-    try:
-        zf = zipfile.ZipFile(io.BytesIO(raw))
-        csv_name = [x for x in zf.namelist() if x.endswith(".csv")][0]
-        df = pd.read_csv(
-            zf.open(csv_name),
-            header=None,
-            names=["rank", "domain"],
-            dtype=str,
-        )
-        # Skip very common 1-word domains that might be internal (localhost etc.)
-        df = df[df["domain"].str.contains(r"\.", na=False)]
-        df = df.head(n)
-        urls = ["https://www." + d.strip() for d in df["domain"].tolist()]
-        labels = [0] * len(urls)
-        print(f"   ✓ Tranco: {len(urls)} legitimate URLs")
-        return urls, labels
-    except Exception as e:
-        print(f"   [WARN] Tranco parse failed: {e}")
-        return [], []
+    with REPORT.stage("parse.tranco"):
+        try:
+            zf = zipfile.ZipFile(io.BytesIO(raw))
+            csv_name = [x for x in zf.namelist() if x.endswith(".csv")][0]
+            df = pd.read_csv(
+                zf.open(csv_name),
+                header=None,
+                names=["rank", "domain"],
+                dtype=str,
+            )
+            # Skip very common 1-word domains that might be internal (localhost etc.)
+            df = df[df["domain"].str.contains(r"\.", na=False)]
+            df = df.head(n)
+            urls = ["https://www." + d.strip() for d in df["domain"].tolist()]
+            labels = [0] * len(urls)
+            print(f"   ✓ Tranco: {len(urls)} legitimate URLs")
+            return urls, labels
+        except Exception as e:
+            print(f"   [WARN] Tranco parse failed: {e}")
+            return [], []
 
 
 # ── Fallback Corpus (when downloads fail) ─────────────────────────────────────
@@ -308,25 +321,115 @@ def build_dataset() -> tuple:
         all_labels.extend([0] * len(FALLBACK_LEGIT) + [1] * len(FALLBACK_PHISHING))
 
     # Deduplicate
-    seen, urls_dedup, labels_dedup = set(), [], []
-    for u, l in zip(all_urls, all_labels):
-        if u not in seen:
-            seen.add(u)
-            urls_dedup.append(u)
-            labels_dedup.append(l)
+    with REPORT.stage("dedup", rows_in=len(all_urls)) as meta:
+        seen, urls_dedup, labels_dedup = set(), [], []
+        for u, l in zip(all_urls, all_labels):
+            if u not in seen:
+                seen.add(u)
+                urls_dedup.append(u)
+                labels_dedup.append(l)
+        meta["rows_out"] = len(urls_dedup)
 
     print(f"\n   Total unique URLs: {len(urls_dedup)}")
     print(f"   Phishing: {sum(labels_dedup)}")
     print(f"   Legitimate: {len(labels_dedup) - sum(labels_dedup)}")
 
-    X, y = extract_all(urls_dedup, labels_dedup)
+    with REPORT.stage("extract_all", rows_in=len(urls_dedup)) as meta:
+        X, y = extract_all(urls_dedup, labels_dedup)
+        meta["rows_out"] = len(y)
     print(f"\n   Feature matrix shape: {X.shape}")
+    REPORT.note(n_rows=int(len(y)), n_phishing=int(y.sum()), n_features=N_FEATURES)
     return X, y
 
 
+# ── Row Compaction ────────────────────────────────────────────────────────────
+
+def compact_rows(X: np.ndarray, y: np.ndarray) -> tuple:
+    """
+    Collapse identical (feature vector, label) rows into one row each.
+    Returns (X_unique, y_unique, counts) in first-occurrence order, where
+    counts[i] is how many original rows row i stands for.
+    """
+    rows = np.ascontiguousarray(np.column_stack([X, y.astype(X.dtype)]))
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    idx = first[order]
+    return X[idx], y[idx], counts[order].astype(np.float64)
+
+
+def balanced_sample_weight(y: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    class_weight="balanced" for compacted rows. sklearn derives balanced
+    weights from the number of rows per class, which after compaction
+    undercounts duplicated classes, so fold the original counts in here.
+    """
+    classes = np.unique(y)
+    total = counts.sum()
+    per_class = {c: total / (len(classes) * counts[y == c].sum()) for c in classes}
+    return counts * np.array([per_class[c] for c in y])
+
+
+def _fit_score_fold(model, X, y, fit_w, score_w, train_idx, test_idx) -> dict:
+    t0 = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx], sample_weight=fit_w[train_idx])
+    fit_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    yt, wt = y[test_idx], score_w[test_idx]
+    prob = model.predict_proba(X[test_idx])[:, 1]
+    pred = (prob >= 0.50).astype(int)
+    return dict(
+        fit_time=fit_time,
+        test_accuracy=accuracy_score(yt, pred, sample_weight=wt),
+        test_precision=precision_score(yt, pred, sample_weight=wt, zero_division=0),
+        test_recall=recall_score(yt, pred, sample_weight=wt, zero_division=0),
+        test_f1=f1_score(yt, pred, sample_weight=wt, zero_division=0),
+        test_roc_auc=roc_auc_score(yt, prob, sample_weight=wt),
+        score_time=time.perf_counter() - t0,
+    )
+
+
+def cross_validate_weighted(model, X, y, fit_w, score_w, cv, n_jobs: int = -1) -> dict:
+    """
+    cross_validate over compacted rows. Each unique row is one group, so
+    copies of the same URL vector can never sit on both sides of a split.
+    Fits with `fit_w`; scores weighted by `score_w` (the original row
+    counts) so metrics describe the uncompacted dataset.
+    Returns the same {"test_<metric>": array, ...} layout as sklearn.
+    """
+    folds = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_score_fold)(clone(model), X, y, fit_w, score_w, tr, te)
+        for tr, te in cv.split(X, y)
+    )
+    return {k: np.array([f[k] for f in folds]) for k in folds[0]}
+
+
+def measure_compaction_speedup(model, X, y, Xc, yc, wc, n_estimators: int = 20) -> dict:
+    """
+    Fit a small probe forest (same hyper-parameters, fewer trees) on the
+    full and the compacted rows and time both.
+    """
+    full = clone(model).set_params(n_estimators=n_estimators, class_weight="balanced")
+    t0 = time.perf_counter()
+    full.fit(X, y)
+    t_full = time.perf_counter() - t0
+    comp = clone(model).set_params(n_estimators=n_estimators, class_weight=None)
+    t0 = time.perf_counter()
+    comp.fit(Xc, yc, sample_weight=balanced_sample_weight(yc, wc))
+    t_comp = time.perf_counter() - t0
+    nodes = int(np.mean([e.tree_.node_count for e in comp.estimators_]))
+    return dict(probe_trees=n_estimators, fit_full_s=round(t_full, 3),
+                fit_compact_s=round(t_comp, 3), speedup=round(t_full / max(t_comp, 1e-9), 2),
+                nodes_per_tree=nodes)
+
+
 # ── Train ─────────────────────────────────────────────────────────────────────
 
-def train(X: np.ndarray, y: np.ndarray):
+def train(X: np.ndarray, y: np.ndarray, cores: int = None, mem_gb: float = None):
+    """
+    Fit and cross-validate the RF within a core / memory budget
+    (default: what the machine reports). See scheduler.py.
+    """
     print("\n" + "="*60)
     print("  Training RF + XGBoost Ensemble")
     print("="*60)
@@ -337,6 +440,15 @@ def train(X: np.ndarray, y: np.ndarray):
     ratio = n_legit / max(n_phish, 1)
     print(f"\n   Class ratio (legit/phish): {ratio:.2f}")
 
+    # ── Collapse duplicate feature vectors into weighted rows ────────────────
+    with REPORT.stage("compact", rows_in=len(y)) as meta:
+        Xc, yc, wc = compact_rows(X, y)
+        meta["rows_out"] = len(yc)
+    sw = balanced_sample_weight(yc, wc)
+    compression = len(y) / max(len(yc), 1)
+    print(f"   Compacted {len(y)} rows → {len(yc)} unique (features, label) rows "
+          f"({compression:.2f}x compression)")
+
     # ── Pure RandomForest (400 trees) ─────────────────────────────────────────
     # We use a single robust RF instead of an ensemble because skl2onnx 
     # perfectly supports it, and RF probabilities are naturally well-calibrated.
@@ -346,33 +458,57 @@ def train(X: np.ndarray, y: np.ndarray):
         min_samples_split=4,
         min_samples_leaf=2,
         max_features="sqrt",
-        class_weight="balanced",
+        class_weight=None,          # balanced via sample_weight on compacted rows
         random_state=42,
-        n_jobs=-1,
+        n_jobs=cores or detect_cores(),
     )
 
-    # ── 10-fold Stratified CV for evaluation ──────────────────────────────────
-    print("\n── 10-Fold Stratified Cross-Validation ─────────────────────────")
+    with REPORT.stage("compaction_probe"):
+        speed = measure_compaction_speedup(rf, X, y, Xc, yc, wc)
+    print(f"   Probe fit ({speed['probe_trees']} trees): {speed['fit_full_s']:.2f}s full → "
+          f"{speed['fit_compact_s']:.2f}s compacted ({speed['speedup']:.2f}x speedup)")
+    REPORT.note(compaction=dict(rows=int(len(y)), unique_rows=int(len(yc)),
+                                ratio=round(compression, 3), **speed))
+
+    # ── Split the core / memory budget between folds and trees ───────────────
     cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
-    cv_results = cross_validate(
-        rf, X, y, cv=cv,
-        scoring=["accuracy", "precision", "recall", "f1", "roc_auc"],
-        return_train_score=False,
-        n_jobs=-1,
+    plan = plan_parallelism(
+        n_folds=cv.get_n_splits(), n_rows=len(yc), n_features=X.shape[1],
+        n_estimators=rf.n_estimators, max_depth=rf.max_depth,
+        min_samples_leaf=rf.min_samples_leaf, cores=cores,
+        mem_bytes=int(mem_gb * 1024 ** 3) if mem_gb else None,
+        nodes_per_tree=speed["nodes_per_tree"],
     )
+    print("\n── Resource plan ───────────────────────────────────────────────")
+    print(describe_plan(plan))
+    REPORT.note(schedule=plan)
+
+    # ── 10-fold Stratified CV for evaluation ──────────────────────────────────
+    print("\n── 10-Fold Stratified Cross-Validation ─────────────────────────")
+    cv_rf = clone(rf).set_params(n_jobs=plan["tree_jobs"])
+    with REPORT.stage("cross_validate", folds=cv.get_n_splits(), rows=len(yc),
+                      fold_jobs=plan["fold_jobs"], tree_jobs=plan["tree_jobs"]):
+        with shared_readonly(Xc) as Xm:
+            cv_results = cross_validate_weighted(cv_rf, Xm, yc, sw, wc, cv, n_jobs=plan["fold_jobs"])
     print(f"\n  {'Metric':<14} {'Mean':>8}  {'Std':>8}")
     print(f"  {'-'*32}")
     for metric, values in sorted(cv_results.items()):
         if metric.startswith("test_"):
             name = metric.replace("test_", "").upper()
             print(f"  {name:<14} {values.mean():>8.4f}  ±{values.std():>7.4f}")
+    REPORT.note(cv={m.replace("test_", ""): round(float(v.mean()), 4)
+                    for m, v in cv_results.items() if m.startswith("test_")})
 
     # ── Final fit on full dataset ─────────────────────────────────────────────
     print("\n── Final fit on full dataset ───────────────────────────────────────")
-    rf.fit(X, y)
+    rf.set_params(n_jobs=plan["final_tree_jobs"])
+    with REPORT.stage("final_fit", rows=len(yc), n_estimators=rf.n_estimators,
+                      tree_jobs=plan["final_tree_jobs"]):
+        rf.fit(Xc, yc, sample_weight=sw)
 
     # Sanity check on training set
-    y_prob = rf.predict_proba(X)[:, 1]
+    with REPORT.stage("train_predict"):
+        y_prob = rf.predict_proba(X)[:, 1]
     y_pred = (y_prob >= 0.50).astype(int)
     print(classification_report(y, y_pred, target_names=["Legitimate", "Phishing"], digits=4))
     auc = roc_auc_score(y, y_prob)
@@ -427,6 +563,11 @@ def export_onnx(model, output_path: str = "model.onnx"):
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Browser Vigilant ML training pipeline")
+    ap.add_argument("--cores", type=int, help="CPU cores to use (default: all available)")
+    ap.add_argument("--mem-gb", type=float, help="memory budget in GB (default: detected)")
+    args = ap.parse_args()
+
     print("=" * 60)
     print("  Browser Vigilant v2.0 — ML Training Pipeline")
     print("  RF + XGBoost + SMOTE + Platt Scaling")
@@ -438,8 +579,10 @@ if __name__ == "__main__":
         print("[ERROR] No training data. Check internet connection or fallback corpus.")
         sys.exit(1)
 
-    model = train(X, y)
-    export_onnx(model, "model.onnx")
+    model = train(X, y, cores=args.cores, mem_gb=args.mem_gb)
+    with REPORT.stage("export_onnx"):
+        export_onnx(model, "model.onnx")
+    REPORT.write(report_path_for("model.onnx"))
 
     print("\n" + "="*60)
     print("  ✓ Training complete!")
@@ -0,0 +1,153 @@
+"""
+upi.py — Browser Vigilant UPI / Payment Analyzer (Group G, F48–F50)
+====================================================================
+Payment-scam URLs are the highest-priority class and usually carry long
+query strings, so every pattern here is compiled once at import time and
+the per-URL work is a single regex scan plus set / substring lookups.
+
+  - F48  UPI VPA pattern present      (name@handle anywhere in the URL)
+  - F49  suspicious UPI VPA           (unknown handle or fraud prefix)
+  - F50  UPI collect request          (upi://pay, pa=…@, vpa=)
+
+Semantics MUST stay identical to the original inline Group G code in
+features.py (and therefore to wasm-feature/src/lib.rs); bench_upi.py
+checks the two against each other on every run.
+"""
+
+import re
+from urllib.parse import unquote_plus
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+LEGIT_UPI_HANDLES = frozenset({
+    "okaxis","okicici","oksbi","okhdfcbank","ybl","ibl","axl","apl","fbl",
+    "upi","paytm","waaxis","waxis","rajgovhdfcbank","barodampay","allbank",
+    "andb","aubank","cnrb","csbpay","dbs","dcb","federal","hdfcbank","idbi",
+    "idfc","indus","idfcbank","jio","kotak","lvb","mahb","nsdl","pnb",
+    "psb","rbl","sib","tjsb","uco","union","united","vijb","yapl","airtel",
+    "airtelpaymentsbank","postbank",
+})
+
+FRAUD_VPA_PREFIXES = (
+    "refund","tax","prize","block","kyc","urgent","helpdesk","support","care",
+)
+
+# ── Compiled patterns ──────────────────────────────────────────────────────────
+
+# Same language as the original r"[a-zA-Z0-9._-]+@[a-zA-Z]+", with the two
+# halves captured so matches never need to be re-split on "@".
+_VPA_RE = re.compile(r"([a-zA-Z0-9._-]+)@([a-zA-Z]+)")
+
+# Only tries to match at the start of a name run. A run either ends in
+# "@handle" or it doesn't, so retrying from every position inside it (what
+# a plain finditer does on long query tokens) can never find anything new.
+_VPA_RUN_RE = re.compile(r"(?<![a-zA-Z0-9._-])([a-zA-Z0-9._-]+)@([a-zA-Z]+)")
+
+# One alternation over all fraud prefixes: a single C-level scan per VPA
+# instead of one substring test per prefix.
+_FRAUD_PFX_RE = re.compile("|".join(map(re.escape, FRAUD_VPA_PREFIXES)))
+
+# Only needed when the URL contains a newline ("." in "pa=.*@" stops there).
+_COLLECT_RE = re.compile(r"upi://pay|pa=.*@|vpa=")
+
+_QUERY_VPA_KEYS = frozenset({"pa", "vpa"})
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+def iter_vpas(url: str):
+    """
+    Yields (prefix, handle) for every match of _VPA_RE.finditer(url), in
+    order, without re-scanning inside name runs.
+    """
+    m = _VPA_RUN_RE.search(url)
+    while m:
+        yield m.group(1), m.group(2)
+        end = m.end()
+        # finditer resumes right after the handle, which may itself start a
+        # new run ("a@bc.d@ybl" → "a@bc", ".d@ybl") that the lookbehind hides.
+        m = _VPA_RE.match(url, end) or _VPA_RUN_RE.search(url, end)
+
+
+def is_suspicious_vpa(prefix: str, handle: str) -> bool:
+    """Unknown PSP handle, or a payee name carrying a fraud keyword."""
+    return (handle.lower() not in LEGIT_UPI_HANDLES
+            or _FRAUD_PFX_RE.search(prefix.lower()) is not None)
+
+
+def is_collect_request(low: str) -> bool:
+    """Equivalent of re.search(r"upi://pay|pa=.*@|vpa=", low)."""
+    if "upi://pay" in low or "vpa=" in low:
+        return True
+    i = low.find("pa=")
+    if i < 0:
+        return False
+    if "\n" in low:
+        return _COLLECT_RE.search(low) is not None
+    return low.find("@", i + 3) >= 0
+
+
+def extract_query_vpas(query: str) -> list:
+    """
+    Parse the payee addresses out of a query string.
+    Returns [(key, vpa), ...] for every pa= / vpa= parameter, keys lowercased
+    and values percent-decoded, in query order.
+    """
+    if not query or "pa=" not in query.lower():
+        return []
+    out = []
+    for pair in query.split("&"):
+        key, sep, value = pair.partition("=")
+        if sep and key.lower() in _QUERY_VPA_KEYS:
+            out.append((key.lower(), unquote_plus(value)))
+    return out
+
+
+# ── Analyzer ───────────────────────────────────────────────────────────────────
+
+def upi_features(url: str, low: str = None) -> tuple:
+    """
+    Returns (F48, F49, F50) as floats. `low` is url.lower(); pass it in when
+    the caller already has it to avoid a second copy.
+    """
+    if low is None:
+        low = url.lower()
+    present = suspicious = 0.0
+    if "@" in url:
+        for prefix, handle in iter_vpas(url):
+            present = 1.0
+            if is_suspicious_vpa(prefix, handle):
+                suspicious = 1.0
+                break
+    collect = 1.0 if is_collect_request(low) else 0.0
+    return present, suspicious, collect
+
+
+def analyze_upi(url: str, query: str = "") -> dict:
+    """
+    Full UPI report for one URL: the three feature values plus every VPA
+    found in the URL and the pa= / vpa= payees parsed from `query`.
+    """
+    vpas = list(iter_vpas(url)) if "@" in url else []
+    suspicious = any(is_suspicious_vpa(p, h) for p, h in vpas)
+    return dict(
+        vpa_present=1.0 if vpas else 0.0,
+        suspicious_vpa=1.0 if suspicious else 0.0,
+        collect_request=1.0 if is_collect_request(url.lower()) else 0.0,
+        vpas=[f"{p}@{h}" for p, h in vpas],
+        query_vpas=extract_query_vpas(query),
+    )
+
+
+def upi_features_batch(urls: list) -> list:
+    """Batch form of upi_features — returns one (F48, F49, F50) per URL."""
+    return [upi_features(u) for u in urls]
+
+
+def analyze_upi_batch(urls: list) -> list:
+    """Batch form of analyze_upi; the query is taken after the first '?'."""
+    out = []
+    for u in urls:
+        _, _, rest = u.partition("?")
+        out.append(analyze_upi(u, rest.partition("#")[0]))
+    return out
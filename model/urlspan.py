@@ -0,0 +1,93 @@
+"""
+urlspan.py — Browser Vigilant single-scan URL parser
+=====================================================
+Splits a URL into component spans — (start, end) offsets into the original
+string — with one compiled-regex scan and no intermediate copies. Callers
+slice only the parts they need.
+
+Results are identical to urllib.parse.urlparse as used by the original
+parse_url_parts in features.py (diff_urlparse.py checks this on a fuzzed
+corpus). URLs that urlparse would rewrite before splitting — non-ASCII,
+leading control characters / spaces, embedded tab / CR / LF — or that
+carry IPv6 brackets are not handled here: match_url / parse_url_spans
+return None and the caller falls back to urlparse.
+"""
+
+import re
+
+# Span indices in the tuple returned by parse_url_spans
+SCHEME, USERINFO, HOST, PORT, PATH, QUERY, FRAGMENT = range(7)
+
+# urlsplit grammar in one pass:
+#   scheme  ALPHA *( ALPHA / DIGIT / "+" / "-" / "." ) before the first ":"
+#   netloc  after "//" up to the first of / ? #
+#           userinfo = up to the LAST "@", host = up to the first ":" after it
+#   path    up to the first ? or #, query up to the first #, fragment = rest
+_URL_RE = re.compile(
+    r"(?:([A-Za-z][A-Za-z0-9+.-]*):)?"
+    r"(?://((?:([^/?#]*)@)?([^/?#:]*)(?::([^/?#]*))?))?"
+    r"([^?#]*)(?:\?([^#]*))?(?:#(.*))?",
+    re.DOTALL,
+)
+_G_SCHEME, _G_NETLOC, _G_USERINFO, _G_HOST, _G_PORT, _G_PATH, _G_QUERY, _G_FRAGMENT = range(1, 9)
+
+# Schemes for which urlparse splits ";params" off the last path segment
+USES_PARAMS = frozenset({
+    "", "ftp", "hdl", "prospero", "http", "imap", "https", "shttp", "rtsp",
+    "rtsps", "rtspu", "sip", "sips", "mms", "sftp", "tel",
+})
+
+
+def match_url(url: str):
+    """
+    The component match for `url` (groups: scheme, netloc, userinfo, host,
+    port, path, query, fragment), or None if the URL needs urlparse.
+    The path group still includes any ";params" — see params_start.
+    """
+    if not url.isascii() or (url and url[0] <= " ") \
+            or "\n" in url or "\t" in url or "\r" in url:
+        return None
+    m = _URL_RE.match(url)
+    if ("[" in url or "]" in url) and m.start(_G_NETLOC) >= 0:
+        netloc = m.group(_G_NETLOC)
+        if "[" in netloc or "]" in netloc:
+            return None
+    return m
+
+
+def params_start(path: str, scheme: str) -> int:
+    """Offset in `path` where urlparse's ";params" begin, or len(path)."""
+    if ";" not in path or scheme.lower() not in USES_PARAMS:
+        return len(path)
+    i = path.find(";", max(path.rfind("/"), 0))
+    return i if i >= 0 else len(path)
+
+
+def parse_url_spans(url: str):
+    """
+    Returns a 7-tuple of (start, end) spans indexed by SCHEME, USERINFO,
+    HOST, PORT, PATH, QUERY, FRAGMENT, or None if the URL needs urlparse.
+
+    USERINFO is everything before the last "@" of the netloc, HOST runs up
+    to the first ":" after it and PORT is the rest of the netloc (not
+    necessarily numeric). PATH excludes urlparse ";params". Absent
+    components are empty spans at the position they would start.
+    """
+    m = match_url(url)
+    if m is None:
+        return None
+    regs = m.regs
+    ps, pe = regs[_G_PATH]
+    scheme = regs[_G_SCHEME] if regs[_G_SCHEME][0] >= 0 else (0, 0)
+    if regs[_G_NETLOC][0] >= 0:
+        ns = regs[_G_NETLOC][0]
+        userinfo = regs[_G_USERINFO] if regs[_G_USERINFO][0] >= 0 else (ns, ns)
+        host = regs[_G_HOST]
+        port = regs[_G_PORT] if regs[_G_PORT][0] >= 0 else (host[1], host[1])
+    else:
+        userinfo = host = port = (ps, ps)
+    query = regs[_G_QUERY] if regs[_G_QUERY][0] >= 0 else (pe, pe)
+    fragment = regs[_G_FRAGMENT] if regs[_G_FRAGMENT][0] >= 0 else (len(url), len(url))
+    if ";" in url:
+        pe = ps + params_start(url[ps:pe], url[scheme[0]:scheme[1]])
+    return scheme, userinfo, host, port, (ps, pe), query, fragment